@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""NavigationWarningScraper.run() 的回歸測試。
+
+1. known_urls 傳入 pandas Series：scrape_nav_warnings.py 把既有資料的 url 欄位當
+   known_urls 傳進 run()。run() 曾以 `known_urls or ()` 判斷，而 bool(Series) 一律拋
+   ValueError（空的也一樣），被外層 try/except 吞掉後變成「爬取失敗、所有頻道失敗」，
+   整個航警爬蟲每次都 exit 1。
+2. 全域限速：列表頁與內容頁都以 thread pool 並行抓，但 msa.gov.cn 有 WAF，
+   所有請求合計的送出速率仍不得超過每 delay 秒一個。
+
+不連網：以假的 fetch_page / 假的 HTTP transport 回傳列表頁與內容頁。
+
+用法:
+    python3 scripts/analysis/test_nav_warning_run.py
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+import httpx
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from scrapers.NavigationWarning_scraper import NavigationWarningScraper  # noqa: E402
+
+BASE = NavigationWarningScraper.BASE_URL
+TODAY = datetime.now().strftime("%Y-%m-%d")
+ARTICLES = [
+    (f"/html/cnmsa/{TODAY[:4]}/article/aaa.html", "闽航警0101/26 台湾海峡军事演习"),
+    (f"/html/cnmsa/{TODAY[:4]}/article/bbb.html", "闽航警0102/26 平潭附近实弹射击"),
+]
+KNOWN_URL = BASE + ARTICLES[0][0]
+NEW_URL = BASE + ARTICLES[1][0]
+
+FAILURES = []
+
+
+def check(name, got, want):
+    ok = got == want
+    print(f"  {'✅' if ok else '❌'} {name}\n     got={got!r} want={want!r}")
+    if not ok:
+        FAILURES.append(name)
+
+
+def fake_fetch_page(url, *args, **kwargs):
+    """列表頁：每個頻道都列出同樣兩則軍事公告；內容頁：一段含座標的正文"""
+    if url.endswith(".jhtml"):
+        links = "".join(f'<li><a href="{href}?hav=1">{title} {TODAY}</a></li>'
+                        for href, title in ARTICLES)
+        return f"<html><body><ul>{links}</ul></body></html>"
+    return ('<html><body><div class="content">闽航警0102/26，平潭附近海域'
+            '实弹射击，25-30.00N、119-50.00E。 收藏</div></body></html>')
+
+
+def run_over_http(delay):
+    """fetch_page 不替換，改由假的 transport 回應，回傳各請求的送出時間（已排序）"""
+    sent = []
+    lock = threading.Lock()
+
+    def handler(request):
+        with lock:
+            sent.append(time.monotonic())
+        return httpx.Response(200, text=fake_fetch_page(str(request.url)))
+
+    scraper = NavigationWarningScraper(delay=delay)
+    scraper.client.close()
+    scraper.client = httpx.Client(transport=httpx.MockTransport(handler))
+    try:
+        warnings = scraper.run(days_back=30)
+    finally:
+        scraper.close()
+    return warnings, sorted(sent)
+
+
+def urls(warnings):
+    """回傳的 url 帶列表頁的 ?hav= 參數，比對前先去掉"""
+    return sorted(NavigationWarningScraper.article_key(w["url"]) for w in warnings)
+
+
+def run_with(known_urls):
+    scraper = NavigationWarningScraper(delay=0)
+    scraper.fetch_page = fake_fetch_page
+    try:
+        warnings = scraper.run(days_back=30, known_urls=known_urls)
+        return scraper, warnings
+    finally:
+        scraper.close()
+
+
+def main():
+    print("NavigationWarningScraper.run() 回歸測試\n" + "=" * 60)
+
+    print("\n[1] known_urls 為含資料的 Series（scrape_nav_warnings.py 的用法）")
+    scraper, warnings = run_with(pd.Series([KNOWN_URL, None]).dropna().astype(str))
+    check("所有頻道皆可存取", scraper.ok_channels, len(scraper.CHANNELS))
+    check("已存檔公告不再抓取，只回傳新公告", urls(warnings), [NEW_URL])
+
+    print("\n[2] known_urls 為空 Series")
+    scraper, warnings = run_with(pd.Series([], dtype=str))
+    check("所有頻道皆可存取", scraper.ok_channels, len(scraper.CHANNELS))
+    check("兩則公告都回傳", urls(warnings), [KNOWN_URL, NEW_URL])
+
+    print("\n[3] known_urls 為 None")
+    _, warnings = run_with(None)
+    check("兩則公告都回傳", len(warnings), 2)
+
+    print("\n[4] 列表頁與內容頁共用同一個全域限速")
+    delay = 0.05
+    warnings, sent = run_over_http(delay)
+    check("請求數（12 個列表頁 + 2 個內容頁）", len(sent), len(NavigationWarningScraper.CHANNELS) + 2)
+    # 限速保證的是各請求預約的送出時段相隔 delay；實際送出還有執行緒喚醒的誤差，
+    # 相鄰兩次可能略小於 delay，因此檢查整段時間：n 個請求至少要花 (n-1)*delay
+    # （各執行緒各自 sleep 時，4 個 worker 約只要四分之一）
+    span = sent[-1] - sent[0]
+    want_span = (len(sent) - 1) * delay
+    check(f"{len(sent)} 個請求耗時 >= {want_span:.2f}s（平均速率 <= 1/delay）",
+          span >= want_span * 0.9, True)
+    check("兩則公告都回傳", len(warnings), 2)
+
+    print("\n" + "=" * 60)
+    if FAILURES:
+        print(f"❌ {len(FAILURES)} 條失敗：{'、'.join(FAILURES)}")
+        return 1
+    print("✅ 全部通過")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
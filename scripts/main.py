@@ -9,11 +9,16 @@ import argparse
 import json
 import logging
 import sys
-import io
 import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import os
+try:
+    import orjson
+except ImportError:  # orjson 只是加速用，未安裝時退回標準 json
+    orjson = None
 # ---------------------------------------------------------------------------
 # Path 設定
 # ---------------------------------------------------------------------------
@@ -28,6 +33,15 @@ from updaters.github_updater import GitHubUpdater
 from updaters.naval_transit_updater import NavalTransitUpdater
 
 
+# 每次執行可能更新、需要推送到 GitHub 的資料檔
+PUSH_CANDIDATES = [
+    "data/news_classified.json",
+    "data/news_relevant.json",
+    "data/naval_transits.csv",
+    "data/last_update.json",
+]
+
+
 def _create_grok_classifier() -> "GrokNewsClassifier":
     """建立 Grok 分類器（需 GROK_API_KEY）"""
     api_key = os.environ.get("GROK_API_KEY")
@@ -60,6 +74,35 @@ def _create_classifier() -> NewsClassifier:
     # 預設: grok
     print("[Main] 使用 Grok LLM 分類器")
     return _create_grok_classifier()
+
+
+def _setup_git() -> GitHubUpdater:
+    """建立 GitHubUpdater 並設定 commit 身分（與步驟 5 並行執行）"""
+    updater = GitHubUpdater()
+    updater.configure_git(
+        name="PLA Data Bot",
+        email="bot@example.com"
+    )
+    return updater
+
+
+# ---------------------------------------------------------------------------
+# Helper: 日誌捕獲
+# ---------------------------------------------------------------------------
+class DequeHandler(logging.Handler):
+    """把格式化後的日誌逐行存進固定長度的 deque，只保留最近 maxlen 行"""
+
+    def __init__(self, maxlen=10_000):
+        super().__init__()
+        self.buf = deque(maxlen=maxlen)
+
+    def emit(self, record):
+        try:
+            self.buf.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
 # ---------------------------------------------------------------------------
 # Helper: JSON 合併
 # ---------------------------------------------------------------------------
@@ -114,8 +157,9 @@ def main():
     # 設定日誌捕獲 (同時輸出到 console 和記憶體)
     # -------------------------------------------------------------------
     start_time = datetime.now()
-    log_capture = io.StringIO()
-    log_handler = logging.StreamHandler(log_capture)
+    # 記錄執行前的 mtime，推送時只挑本次有寫入的檔案
+    pre_mtimes = {p: os.path.getmtime(p) for p in PUSH_CANDIDATES if os.path.exists(p)}
+    log_handler = DequeHandler(maxlen=10_000)
     log_handler.setLevel(logging.INFO)
     log_handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
     logger = logging.getLogger('daily_update')
@@ -204,7 +248,7 @@ def main():
         print("\n❌ No articles scraped. Exiting.")
         logger.error("No articles scraped. Exiting.")
         # 即使失敗也寫入 log
-        _save_execution_log(stats, start_time, log_capture, success=False)
+        _save_execution_log(stats, start_time, log_handler, success=False)
         sys.exit(1)
     print(f"\n📊 Total articles scraped: {len(all_articles)}")
     logger.info(f"Total articles scraped: {len(all_articles)}")
@@ -243,11 +287,17 @@ def main():
             "status": "failed",
             "error": str(e)
         }
-        _save_execution_log(stats, start_time, log_capture, success=False)
+        _save_execution_log(stats, start_time, log_handler, success=False)
         sys.exit(1)
     # -----------------------------------------------------------------------
     # 5. 儲存結果（合併既有資料，避免覆蓋其他爬蟲的成果）
     # -----------------------------------------------------------------------
+    # 步驟 6 的 git 設定與步驟 5 的資料寫入互不相依，先在背景執行
+    git_future = None
+    if not args.no_push:
+        git_executor = ThreadPoolExecutor(max_workers=1)
+        git_future = git_executor.submit(_setup_git)
+        git_executor.shutdown(wait=False)
     print("\n[5/6] 保存數據...")
     data_dir = Path("data")
     data_dir.mkdir(exist_ok=True)
@@ -258,13 +308,6 @@ def main():
     existing_relevant = _load_existing_json(relevant_file)
     merged_classified = _merge_articles(existing_classified, classified)
     merged_relevant = _merge_articles(existing_relevant, relevant)
-    with classified_file.open("w", encoding="utf-8") as f:
-        json.dump(merged_classified, f, ensure_ascii=False, indent=2)
-    with relevant_file.open("w", encoding="utf-8") as f:
-        json.dump(merged_relevant, f, ensure_ascii=False, indent=2)
-    print(f"✓ Saved: {classified_file} ({len(merged_classified)} articles)")
-    print(f"✓ Saved: {relevant_file} ({len(merged_relevant)} articles)")
-    logger.info(f"Saved: {classified_file}, {relevant_file}")
     # -----------------------------------------------------------------------
     # 5b. 更新 naval_transits.csv（Foreign_battleship → 軍艦通過記錄）
     # -----------------------------------------------------------------------
@@ -291,18 +334,22 @@ def main():
         if transit_articles:
             merged_classified = _merge_articles(merged_classified, transit_articles)
             merged_relevant = _merge_articles(merged_relevant, transit_articles)
-            with classified_file.open("w", encoding="utf-8") as f:
-                json.dump(merged_classified, f, ensure_ascii=False, indent=2)
-            with relevant_file.open("w", encoding="utf-8") as f:
-                json.dump(merged_relevant, f, ensure_ascii=False, indent=2)
             print(f"✓ Synced {len(transit_articles)} transit records to JSON")
             logger.info(f"Synced {len(transit_articles)} transit records to JSON")
     except Exception as e:
         print(f"✗ Naval transit update error: {e}")
         logger.error(f"Naval transit update error: {e}")
         stats["naval_transits"] = {"status": "failed", "error": str(e)}
+    # 5b/5c 成功與否都只寫一次 JSON（失敗時寫入的是未含軍艦記錄的合併結果）
+    with classified_file.open("w", encoding="utf-8") as f:
+        json.dump(merged_classified, f, ensure_ascii=False, indent=2)
+    with relevant_file.open("w", encoding="utf-8") as f:
+        json.dump(merged_relevant, f, ensure_ascii=False, indent=2)
+    print(f"✓ Saved: {classified_file} ({len(merged_classified)} articles)")
+    print(f"✓ Saved: {relevant_file} ({len(merged_relevant)} articles)")
+    logger.info(f"Saved: {classified_file}, {relevant_file}")
     # 儲存執行日誌到 data/logs/
-    log_file = _save_execution_log(stats, start_time, log_capture, success=True)
+    log_file = _save_execution_log(stats, start_time, log_handler, success=True)
     # -----------------------------------------------------------------------
     # 6. GitHub 推送
     # -----------------------------------------------------------------------
@@ -311,21 +358,18 @@ def main():
         return
     print("\n[6/6] 推送到 GitHub...")
     try:
-        updater = GitHubUpdater()
-        updater.configure_git(
-            name="PLA Data Bot",
-            email="bot@example.com"
-        )
+        updater = git_future.result()
         updater.create_summary_log(stats, "data/last_update.json")
-        # 收集要推送的檔案（包含 log）
+        # 收集要推送的檔案（包含 log），略過本次未寫入的檔案
         push_files = [
-            "data/news_classified.json",
-            "data/news_relevant.json",
-            "data/naval_transits.csv",
-            "data/last_update.json",
+            p for p in PUSH_CANDIDATES
+            if os.path.exists(p) and os.path.getmtime(p) > pre_mtimes.get(p, 0)
         ]
         if log_file and Path(log_file).exists():
             push_files.append(str(log_file))
+            console_log = Path(log_file).with_suffix(".log")
+            if console_log.exists():
+                push_files.append(str(console_log))
         success = updater.commit_and_push_data(
             data_files=push_files,
             message=f"🤖 Auto-update: {datetime.now():%Y-%m-%d %H:%M}"
@@ -343,23 +387,34 @@ def main():
 # ---------------------------------------------------------------------------
 # Helper: 儲存執行日誌
 # ---------------------------------------------------------------------------
-def _save_execution_log(stats, start_time, log_capture, success=True):
-    """將執行統計與日誌輸出寫入 data/logs/<timestamp>.json"""
+def _dump_json_bytes(data):
+    """序列化為縮排 2 格的 UTF-8 JSON bytes（有 orjson 時走 orjson）"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _save_execution_log(stats, start_time, log_handler, success=True):
+    """
+    將執行統計寫入 data/logs/<timestamp>.json，
+    console 輸出另存為同名的 .log 純文字檔（JSON 只記路徑）。
+    """
     try:
         end_time = datetime.now()
         logs_dir = Path("data/logs")
         logs_dir.mkdir(parents=True, exist_ok=True)
+        log_filename = logs_dir / f"{start_time:%Y%m%d_%H%M%S}.json"
+        console_filename = log_filename.with_suffix(".log")
+        console_filename.write_text("\n".join(log_handler.buf) + "\n", encoding="utf-8")
         log_data = {
             "run_timestamp": start_time.isoformat(),
             "end_timestamp": end_time.isoformat(),
             "duration_seconds": round((end_time - start_time).total_seconds(), 1),
             "success": success,
             "stats": stats,
-            "console_output": log_capture.getvalue()
+            "console_output_path": console_filename.as_posix(),
         }
-        log_filename = logs_dir / f"{start_time:%Y%m%d_%H%M%S}.json"
-        with log_filename.open("w", encoding="utf-8") as f:
-            json.dump(log_data, f, ensure_ascii=False, indent=2)
+        log_filename.write_bytes(_dump_json_bytes(log_data))
         print(f"📝 Log saved: {log_filename}")
         return str(log_filename)
     except Exception as e:
@@ -106,13 +106,16 @@ def _clamp(start: Optional[date], end: Optional[date]):
     return start, end
 
 
+_PUBLISH_DATE = re.compile(r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})')
+
+
 def _parse_publish(publish) -> Optional[date]:
     if publish is None:
         return None
     if isinstance(publish, date):
         return publish
     s = str(publish).strip()[:10]
-    m = re.match(r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})', s)
+    m = _PUBLISH_DATE.match(s)
     if not m:
         return None
     return _make_date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
@@ -5,23 +5,36 @@ Threads 社群媒體自動發布腳本
 """
 import argparse
 import base64
+import csv
+import functools
+import hashlib
+import io
 import json
 import os
+import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend for CI
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import pandas as pd
 import requests
+try:
+    import orjson
+except ImportError:  # orjson 只是加速用，未安裝時退回標準 json
+    orjson = None
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 # ── 常數設定 ───────────────────────────────────────────────
 REPO_OWNER = "s0914712"
 REPO_NAME = "pla-data-dashboard"
 CSV_PATH = "data/predictions/latest_prediction.csv"
 JAPAN_MOD_CSV = "data/JapanandBattleship.csv"
 NAV_WARN_JSON = "data/navigation_warnings/military_exercises.json"
+# load_japan_mod_latest 實際用到的欄位（其餘欄位不解析）
+JAPAN_MOD_COLUMNS = [
+    "date", "remark", "艦型", "宮古", "對馬", "大禹", "與那國",
+    "空中", "航母活動", "艦通過", "聯合演訓",
+]
 CHART_DIR = "data/charts"
 CHART_FILENAME = "threads_chart.png"
 CHART_REPO_PATH = f"{CHART_DIR}/{CHART_FILENAME}"
@@ -29,122 +42,210 @@ WEEKDAY_MAP = {
     "Monday": "Mon", "Tuesday": "Tue", "Wednesday": "Wed",
     "Thursday": "Thu", "Friday": "Fri", "Saturday": "Sat", "Sunday": "Sun",
 }
+# Threads container 狀態輪詢間隔（秒）
+CONTAINER_POLL_DELAYS = (2, 3, 5, 8, 13)
+TW_TZ = timezone(timedelta(hours=8))
+# 發文固定格式；date 為 datetime，由 format spec 直接轉成 %m/%d
+TW_MOD_LINE = "TW MOD ({date:%m/%d} {weekday}): {sorties} sorties".format
+def _build_session() -> requests.Session:
+    """共用 keep-alive 連線；冪等請求遇 429/5xx 自動重試（POST 不重試，避免重複發文）"""
+    session = requests.Session()
+    session.headers["User-Agent"] = f"{REPO_NAME}-threads-publisher"
+    retry = Retry(
+        total=3, backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False,
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+    return session
+_SESSION = _build_session()
 RISK_EMOJI = {
     "LOW": "🟢",
     "MEDIUM": "🟡",
     "HIGH": "🔴",
     "CRITICAL": "🔴",
 }
-def parse_csv(csv_path: str) -> pd.DataFrame:
-    """讀取並解析 latest_prediction.csv"""
-    df = pd.read_csv(csv_path, encoding="utf-8-sig")
-    df["date"] = pd.to_datetime(df["date"])
-    return df
-def split_actual_vs_predicted(df: pd.DataFrame):
+# latest_prediction.csv 中需轉成數值的欄位（空字串 → None）
+PRED_FLOAT_FIELDS = ("predicted_sorties", "lower_bound", "upper_bound", "actual_sorties")
+def _to_float(value: str | None) -> float | None:
+    return float(value) if value not in ("", None) else None
+@functools.lru_cache(maxsize=4)
+def parse_csv(csv_path: str) -> tuple[dict, ...]:
+    """
+    逐列讀取 latest_prediction.csv：date 轉 datetime，架次欄位轉 float。
+    同一路徑在同一程序內只解析一次，回傳值請勿就地修改。
+    """
+    rows = []
+    with open(csv_path, encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            row["date"] = datetime.strptime(row["date"][:10], "%Y-%m-%d")
+            for field in PRED_FLOAT_FIELDS:
+                row[field] = _to_float(row.get(field))
+            rows.append(row)
+    return tuple(rows)
+def split_actual_vs_predicted(rows):
     """區分已有實際架次 vs 純預測的列"""
-    actual = df[df["actual_sorties"].notna()].copy()
-    predicted = df[df["actual_sorties"].isna()].copy()
+    actual, predicted = [], []
+    for row in rows:
+        (predicted if row["actual_sorties"] is None else actual).append(row)
     return actual, predicted
-def generate_chart(df: pd.DataFrame, actual: pd.DataFrame, predicted: pd.DataFrame, output_path: str):
-    """產生折線圖：實際架次 + 預測架次 + 信心區間"""
-    plt.rcParams['font.sans-serif'] = ['DejaVu Sans']
-    fig, ax = plt.subplots(figsize=(10, 5))
+@dataclass(frozen=True)
+class Snapshot:
+    """main 一次整理好、供圖表與發文共用的資料（皆為純 Python 型別）"""
+    actual_dates: list[datetime]
+    actual_values: list[float]
+    pred_dates: list[datetime]
+    pred_values: list[float]
+    pred_lower: list[float]
+    pred_upper: list[float]
+    latest_actual: dict | None
+def build_snapshot(rows) -> Snapshot:
+    """把 parse_csv 的列拆成實際/預測兩組欄位序列"""
+    actual, predicted = split_actual_vs_predicted(rows)
+    return Snapshot(
+        actual_dates=[r["date"] for r in actual],
+        actual_values=[r["actual_sorties"] for r in actual],
+        pred_dates=[r["date"] for r in predicted],
+        pred_values=[r["predicted_sorties"] for r in predicted],
+        pred_lower=[r["lower_bound"] for r in predicted],
+        pred_upper=[r["upper_bound"] for r in predicted],
+        latest_actual=actual[-1] if actual else None,
+    )
+@functools.lru_cache(maxsize=1)
+def _get_figure():
+    """
+    延遲載入 matplotlib；同一程序內重複使用同一個 Figure，省去每次重建 artist 的成本。
+    直接建立 Figure + Agg canvas，不經過 pyplot（免載入 GUI backend 與全域 figure 管理）。
+    """
+    import matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    matplotlib.rcParams['font.sans-serif'] = ['DejaVu Sans']
+    # 1000×500 px 已足夠 Threads 顯示；dpi/底色在建立時就固定，輸出時不必再經 savefig 設定
+    fig = Figure(figsize=(10, 5), dpi=100, facecolor="white")
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots()
+def generate_chart(snap: Snapshot, output_path: str) -> bytes:
+    """產生折線圖：實際架次 + 預測架次 + 信心區間；寫入 output_path 並回傳 PNG bytes"""
+    fig, ax = _get_figure()
+    import matplotlib.dates as mdates
+    ax.cla()
     # 實際架次（藍色實線）
-    if not actual.empty:
+    if snap.actual_dates:
         ax.plot(
-            actual["date"], actual["actual_sorties"],
+            snap.actual_dates, snap.actual_values,
             color="#2563EB", linewidth=2.5, marker="o", markersize=7,
             label="Published Sorties", zorder=5,
         )
     # 預測架次（紅色虛線）
-    if not predicted.empty:
+    if snap.pred_dates:
         # 連接最後一個實際點到第一個預測點
-        if not actual.empty:
-            bridge = pd.DataFrame({
-                "date": [actual["date"].iloc[-1], predicted["date"].iloc[0]],
-                "val": [actual["actual_sorties"].iloc[-1], predicted["predicted_sorties"].iloc[0]],
-            })
-            ax.plot(bridge["date"], bridge["val"], color="#DC2626", linewidth=2, linestyle="--", alpha=0.5)
+        if snap.actual_dates:
+            ax.plot(
+                [snap.actual_dates[-1], snap.pred_dates[0]],
+                [snap.actual_values[-1], snap.pred_values[0]],
+                color="#DC2626", linewidth=2, linestyle="--", alpha=0.5,
+            )
         ax.plot(
-            predicted["date"], predicted["predicted_sorties"],
+            snap.pred_dates, snap.pred_values,
             color="#DC2626", linewidth=2.5, marker="s", markersize=7,
             linestyle="--", label="AI Predicted Sorties", zorder=5,
         )
         # 信心區間
         ax.fill_between(
-            predicted["date"],
-            predicted["lower_bound"],
-            predicted["upper_bound"],
+            snap.pred_dates, snap.pred_lower, snap.pred_upper,
             color="#DC2626", alpha=0.1, label="95% Confidence Interval",
         )
-    # 全部日期的預測線（淺灰色背景）
-    ax.plot(
-        df["date"], df["predicted_sorties"],
-        color="#9CA3AF", linewidth=1, linestyle=":", alpha=0.6,
-    )
     # 格式化
     ax.set_title("PLA Aircraft Sorties — Actual vs Predicted", fontsize=16, fontweight="bold", pad=15)
     ax.set_xlabel("Date", fontsize=12)
     ax.set_ylabel("Number of Sorties", fontsize=12)
     ax.xaxis.set_major_formatter(mdates.DateFormatter("%m/%d"))
     ax.xaxis.set_major_locator(mdates.DayLocator())
-    plt.xticks(rotation=45, ha="right")
+    for label in ax.get_xticklabels():
+        label.set(rotation=45, ha="right")
     ax.legend(loc="upper left", fontsize=10)
     ax.grid(True, alpha=0.3)
     ax.set_ylim(bottom=0)
     # 在預測點上標數字
-    if not predicted.empty:
-        for _, row in predicted.head(3).iterrows():
+    if snap.pred_dates:
+        for date, value in zip(snap.pred_dates[:3], snap.pred_values[:3]):
             ax.annotate(
-                f'{row["predicted_sorties"]:.1f}',
-                (row["date"], row["predicted_sorties"]),
+                f'{value:.1f}',
+                (date, value),
                 textcoords="offset points", xytext=(0, 12),
                 fontsize=9, fontweight="bold", color="#DC2626",
                 ha="center",
             )
-    plt.tight_layout()
+    # 先排版一次即可；bbox_inches="tight" 會讓 savefig 多渲染一遍
+    fig.tight_layout()
+    # 直接走 Agg canvas 輸出 PNG；optimize 讓 Pillow 縮小檔案
+    buf = io.BytesIO()
+    fig.canvas.print_png(buf, pil_kwargs={"optimize": True})
+    png_bytes = buf.getvalue()
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    fig.savefig(output_path, dpi=150, bbox_inches="tight", facecolor="white")
-    plt.close(fig)
+    Path(output_path).write_bytes(png_bytes)
     print(f"✅ 圖表已儲存：{output_path}")
-    return output_path
-def upload_chart_to_github(local_path: str, github_token: str) -> str:
-    """透過 GitHub API 上傳圖片到 repo，回傳公開 raw URL"""
+    return png_bytes
+def _local_chart_sha() -> str | None:
+    """從本地 checkout 取得圖表目前的 blob sha，省去一次 GitHub API GET"""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", f"HEAD:{CHART_REPO_PATH}"],
+            capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+def _remote_chart_sha(url: str, headers: dict) -> str | None:
+    """向 Contents API 查詢圖表目前的 sha（檔案不存在時回傳 None）"""
+    resp = _SESSION.get(url, headers=headers)
+    if resp.status_code == 200:
+        return resp.json().get("sha")
+    return None
+def upload_chart_to_github(png_bytes: bytes, github_token: str, known_sha: str | None = None) -> str:
+    """透過 GitHub API 上傳圖片到 repo，回傳公開 raw URL（known_sha 為事先查好的本地 blob sha）"""
     url = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/contents/{CHART_REPO_PATH}"
     headers = {
         "Authorization": f"Bearer {github_token}",
         "Accept": "application/vnd.github.v3+json",
     }
-    # 讀取檔案內容
-    with open(local_path, "rb") as f:
-        content_b64 = base64.b64encode(f.read()).decode()
-    # 檢查是否已存在（需要 sha 來更新）
-    sha = None
-    resp = requests.get(url, headers=headers)
-    if resp.status_code == 200:
-        sha = resp.json().get("sha")
-    # 上傳/更新
-    payload = {
-        "message": f"📊 Update Threads chart — {datetime.now().strftime('%Y-%m-%d')}",
-        "content": content_b64,
-        "branch": "main",
-    }
-    if sha:
-        payload["sha"] = sha
-    resp = requests.put(url, headers=headers, json=payload)
+    content_b64 = base64.b64encode(png_bytes).decode()
+    def _put(sha: str | None):
+        payload = {
+            "message": f"📊 Update Threads chart — {datetime.now().strftime('%Y-%m-%d')}",
+            "content": content_b64,
+            "branch": "main",
+        }
+        if sha:
+            payload["sha"] = sha
+        if orjson is None:
+            return _SESSION.put(url, headers=headers, json=payload)
+        # payload 幾乎都是 base64 圖片字串，用 orjson 序列化較快
+        return _SESSION.put(
+            url, headers={**headers, "Content-Type": "application/json"},
+            data=orjson.dumps(payload),
+        )
+    # 更新既有檔案需要 sha：先用本地 checkout 的 sha，
+    # 過期（409）或缺少（422）時才向 API 查詢最新 sha 再試一次
+    resp = _put(known_sha or _local_chart_sha())
+    if resp.status_code in (409, 422):
+        resp = _put(_remote_chart_sha(url, headers))
     if resp.status_code not in (200, 201):
         print(f"❌ GitHub 上傳失敗：{resp.status_code} {resp.text}")
         sys.exit(1)
-    # 加上 timestamp 避免 CDN cache
-    raw_url = f"https://raw.githubusercontent.com/{REPO_OWNER}/{REPO_NAME}/main/{CHART_REPO_PATH}?t={int(datetime.now().timestamp())}"
+    # 以圖片內容雜湊當 cache-bust：內容沒變時 URL 不變，CDN 快取仍可命中
+    content_hash = hashlib.md5(png_bytes).hexdigest()[:10]
+    raw_url = f"https://raw.githubusercontent.com/{REPO_OWNER}/{REPO_NAME}/main/{CHART_REPO_PATH}?t={content_hash}"
     print(f"✅ 圖片已上傳：{raw_url}")
     return raw_url
 def load_japan_mod_latest() -> dict | None:
     """Load the latest Japan MOD entry that has a non-empty remark."""
+    import pandas as pd  # 延遲載入：只有這裡還需要 pandas
     try:
         if not os.path.exists(JAPAN_MOD_CSV):
             return None
-        df = pd.read_csv(JAPAN_MOD_CSV, encoding="utf-8-sig")
+        # 全部以字串讀入：旗標欄位本來就以 "1"/"1.0" 比對，省去型別推斷
+        df = pd.read_csv(JAPAN_MOD_CSV, encoding="utf-8-sig", usecols=JAPAN_MOD_COLUMNS, dtype=str)
         # Filter rows with actual remark content
         mask = df["remark"].notna() & (df["remark"].astype(str).str.strip() != "") & (df["remark"].astype(str) != "False")
         valid = df[mask].copy()
@@ -198,18 +299,18 @@ def load_nav_warnings() -> list[dict]:
         return []
 
 
-def compose_post_text(actual: pd.DataFrame, predicted: pd.DataFrame, df: pd.DataFrame) -> str:
+def compose_post_text(snap: Snapshot) -> str:
     """Compose Threads post text with all data sources."""
-    tw_tz = timezone(timedelta(hours=8))
-    today = datetime.now(tw_tz).strftime("%Y/%m/%d")
+    today = datetime.now(TW_TZ).strftime("%Y/%m/%d")
     lines = [f"OSINT Daily Brief — {today}", ""]
     # ── TW MOD published sorties ──
-    if not actual.empty:
-        latest_actual = actual.iloc[-1]
-        weekday = WEEKDAY_MAP.get(latest_actual["day_of_week"], "")
-        date_str = latest_actual["date"].strftime("%m/%d")
-        sorties = int(latest_actual["actual_sorties"])
-        lines.append(f"TW MOD ({date_str} {weekday}): {sorties} sorties")
+    if snap.latest_actual:
+        latest_actual = snap.latest_actual
+        lines.append(TW_MOD_LINE(
+            date=latest_actual["date"],
+            weekday=WEEKDAY_MAP.get(latest_actual["day_of_week"], ""),
+            sorties=int(latest_actual["actual_sorties"]),
+        ))
         lines.append("")
     # ── Japan MOD latest report ──
     japan = load_japan_mod_latest()
@@ -246,22 +347,34 @@ def publish_to_threads(text: str, image_url: str | None, user_id: str, access_to
     }
     if image_url:
         create_params["image_url"] = image_url
-    resp = requests.post(f"{base_url}/{user_id}/threads", data=create_params)
+    resp = _SESSION.post(f"{base_url}/{user_id}/threads", data=create_params)
     if resp.status_code != 200:
         print(f"❌ 建立 container 失敗：{resp.status_code} {resp.text}")
         sys.exit(1)
     container_id = resp.json().get("id")
     print(f"✅ Media container 已建立：{container_id}")
-    # 等待讓伺服器處理（圖片需要較長時間）
-    wait_sec = 30 if image_url else 5
-    print(f"⏳ 等待 {wait_sec} 秒讓 Threads 處理...")
-    time.sleep(wait_sec)
+    # 以遞增間隔輪詢 container 狀態，處理完成就發布（總計約 31 秒後仍嘗試發布）
+    print("⏳ 等待 Threads 處理...")
+    for delay in CONTAINER_POLL_DELAYS:
+        time.sleep(delay)
+        resp = _SESSION.get(
+            f"{base_url}/{container_id}",
+            params={"fields": "status,error_message", "access_token": access_token},
+        )
+        if resp.status_code != 200:
+            continue
+        status = resp.json().get("status")
+        if status == "FINISHED":
+            break
+        if status in ("ERROR", "EXPIRED"):
+            print(f"❌ Container 處理失敗：{status} {resp.json().get('error_message', '')}")
+            sys.exit(1)
     # ── 步驟二：發布 container ──
     publish_params = {
         "creation_id": container_id,
         "access_token": access_token,
     }
-    resp = requests.post(f"{base_url}/{user_id}/threads_publish", data=publish_params)
+    resp = _SESSION.post(f"{base_url}/{user_id}/threads_publish", data=publish_params)
     if resp.status_code != 200:
         print(f"❌ 發布失敗：{resp.status_code} {resp.text}")
         sys.exit(1)
@@ -276,15 +389,21 @@ def main():
     args = parser.parse_args()
     # ── 1. 解析 CSV ──
     print("📂 讀取 CSV...")
-    df = parse_csv(args.csv)
-    actual, predicted = split_actual_vs_predicted(df)
-    print(f"  Actual: {len(actual)} days | Predicted: {len(predicted)} days")
-    # ── 2. 產生圖表 ──
+    snap = build_snapshot(parse_csv(args.csv))
+    print(f"  Actual: {len(snap.actual_dates)} days | Predicted: {len(snap.pred_dates)} days")
+    # ── 2+3. 產生圖表、組合發文內容（與查詢圖表 sha 互不相依，並行執行）──
     chart_path = os.path.join(args.chart_dir, CHART_FILENAME)
+    github_token = os.environ.get("GITHUB_TOKEN")
     print("🎨 產生折線圖...")
-    generate_chart(df, actual, predicted, chart_path)
-    # ── 3. 組合發文內容 ──
-    post_text = compose_post_text(actual, predicted, df)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        sha_future = None
+        if github_token and not args.dry_run:
+            sha_future = executor.submit(_local_chart_sha)
+        chart_future = executor.submit(generate_chart, snap, chart_path)
+        text_future = executor.submit(compose_post_text, snap)
+        png_bytes = chart_future.result()
+        post_text = text_future.result()
+        chart_sha = sha_future.result() if sha_future else None
     print("\n📝 發文內容：")
     print("─" * 40)
     print(post_text)
@@ -293,13 +412,12 @@ def main():
         print("\n🏁 Dry-run 模式 — 未實際發布")
         return
     # ── 4. 上傳圖片到 GitHub ──
-    github_token = os.environ.get("GITHUB_TOKEN")
     if not github_token:
         print("⚠️ 未設定 GITHUB_TOKEN，跳過圖片上傳")
         image_url = None
     else:
         print("📤 上傳圖片到 GitHub...")
-        image_url = upload_chart_to_github(chart_path, github_token)
+        image_url = upload_chart_to_github(png_bytes, github_token, known_sha=chart_sha)
     # ── 5. 發布到 Threads ──
     user_id = os.environ.get("THREADS_USER_ID")
     access_token = os.environ.get("THREADS_ACCESS_TOKEN")
@@ -158,8 +158,12 @@ def main():
     all_channels_failed = False
     try:
         from scrapers.NavigationWarning_scraper import NavigationWarningScraper
+        # 已存檔的公告不再抓內容頁：merge_warnings 以既有資料優先，重抓也用不到
+        known_urls = (existing_df['url'].dropna().astype(str).tolist()
+                      if 'url' in existing_df else [])
         with NavigationWarningScraper(delay=1.0) as scraper:
-            new_warnings = scraper.run(days_back=args.days_back, max_pages=args.max_pages)
+            new_warnings = scraper.run(days_back=args.days_back, max_pages=args.max_pages,
+                                       known_urls=known_urls)
             all_channels_failed = scraper.ok_channels == 0
         print(f'🎯 本次抓取: {len(new_warnings)} 筆')
     except Exception as e:
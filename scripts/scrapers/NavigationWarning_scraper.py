@@ -11,8 +11,11 @@
 import os
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Optional
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
 from .base_scraper import BaseScraper
 
 # 起訖日解析集中在 scripts/nav_warning_dates.py。這支模組可能以套件
@@ -23,6 +26,50 @@ except ImportError:  # pragma: no cover - 相依於呼叫端的載入方式
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from nav_warning_dates import parse_periods, format_periods_zh, period_bounds
 
+# 列表文字末端的發布日
+_LIST_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+# 航警編號（正文起點），依序嘗試。編號後 50 字內要有標點才算正文（導覽列、
+# 相關連結裡的編號後面不會接句子），這個條件用 lookahead 交給 regex 引擎，
+# 第一個符合的位置就是起點，不必先列出所有候選再逐一檢查
+_START_RES = tuple(re.compile(p + r'(?=.{0,49}[，。,])', re.DOTALL) for p in (
+    r'[a-zA-Z沪津辽冀鲁浙闽粤桂琼深厦甬青连珠汕湛苏]航警?\d+/\d+',
+    r'[A-Z]{2,3}\d+/\d+',
+))
+
+# 正文結束標記（頁尾工具列），取最先出現的一個
+_END_RE = re.compile('|'.join(map(re.escape, ('收藏', '打印本页', '关闭窗口'))))
+
+# 列表頁的航警文章連結：/html/cnmsa/.../article/....html。篩選在 lxml 的 XPath
+# （C 實作）裡完成，Python 端只處理命中的 <a>
+_ARTICLE_LINK_XPATH = etree.XPath(
+    "//a[contains(@href, '/article/') and contains(@href, '.html')"
+    " and contains(@href, '/html/cnmsa/')]")
+# httpx 已依回應標頭解碼成 str；重新編成 UTF-8 並明確告訴 lxml，
+# 避免它再照頁面 <meta charset="gb2312"> 解一次而變亂碼
+_UTF8_HTML_PARSER = etree.HTMLParser(encoding='utf-8')
+
+# 公告內容頁的正文容器，依優先序嘗試。前段的 div.<class> 可以只建這些 div
+# （含其子樹）就判斷；都沒有時才需要整棵 DOM（<article>、main-content、body）
+_CONTENT_DIV_CLASSES = ('article-content', 'content', 'TRS_Editor', 'detail-content')
+# 解析當下 class 還是未拆開的原始字串（"x content y"），用 regex 比對單字
+_CONTENT_STRAINER = SoupStrainer('div', class_=re.compile(
+    r'(?:^|\s)(?:%s)(?:\s|$)' % '|'.join(map(re.escape, _CONTENT_DIV_CLASSES))))
+_CONTENT_SELECTORS_STRAINED = tuple(f'div.{c}' for c in _CONTENT_DIV_CLASSES)
+_CONTENT_SELECTORS_FULL = ('article', 'div.main-content')
+
+# 座標格式，說明見 parse_coordinates
+_COORD_PATTERNS = (
+    ('dash', r'(\d{1,2})-(\d{1,2}(?:\.\d+)?)\s*([NS])\s*[/\s、，,]?\s*'
+             r'(\d{1,3})-(\d{1,2}(?:\.\d+)?)\s*([EW])'),
+    ('dms', r'([NS])?\s*(\d{1,2})°(\d{1,2})′(\d{1,2}(?:\.\d+)?)?″?\s*([NS])?\s*[、,\s]*'
+            r'([EW])?\s*(\d{1,3})°(\d{1,2})′(\d{1,2}(?:\.\d+)?)?″?\s*([EW])?'),
+    ('dec', r'(\d{1,2}(?:\.\d+)?)\s*([NS])\s*(\d{1,3}(?:\.\d+)?)\s*([EW])'),
+)
+# 各格式分開掃描（不併成一條 alternation）：輸出依格式分組（dash → dms → dec），
+# 不同格式的比對範圍重疊時也各自都能命中；下游畫區域時依賴點的順序
+_COORD_RES = tuple((kind, re.compile(p)) for kind, p in _COORD_PATTERNS)
+
 
 class NavigationWarningScraper(BaseScraper):
     """中國海事局航行警告爬蟲（軍事專用）"""
@@ -52,20 +99,42 @@ class NavigationWarningScraper(BaseScraper):
         '軍事', '演習', '實彈', '射擊訓練', '禁止駛入',
         'EXERCISE', 'MISSION', '军演', '軍演'
     ]
+    # 所有關鍵字併成一條 alternation，標題只掃一次，不必逐一 `kw in title`
+    _MILITARY_RE = re.compile('|'.join(map(re.escape, MILITARY_KEYWORDS)))
     
-    def __init__(self, timeout: int = 30, delay: float = 1.0):
+    def __init__(self, timeout: int = 30, delay: float = 1.0, detail_workers: int = 4,
+                 military_only: bool = True):
         super().__init__(name="msa_military", timeout=timeout, delay=delay)
+        # 只抓軍事相關公告（預設）；列表頁解析時就先濾掉其他公告
+        self.military_only = military_only
+        # 公告內容頁並行抓取的 worker 數。並行只用來重疊網路等待：所有 worker 的請求
+        # 都經過 BaseScraper.fetch_page 的全域限速，對站方的速率上限仍是 1 / delay
+        self.detail_workers = max(1, detail_workers)
         # run() 之後記錄可存取/不可存取的海事局數，供上層判斷是否全面失敗
         self.ok_channels = 0
         self.failed_channels = 0
     
+    @staticmethod
+    def article_key(url: str) -> str:
+        """公告的穩定識別鍵。
+
+        .html 詳情頁的 ?hav=... 會隨列表頁變動，同一則公告可能帶不同查詢字串，
+        因此去掉；舊版 /page/article.do 連結的文章 id 就在查詢字串裡，保留原樣。
+        """
+        base = url.partition('?')[0]
+        return base if base.endswith('.html') else url
+
     def is_military_related(self, title: str) -> bool:
         """檢查標題是否與軍事相關"""
-        return any(kw in title for kw in self.MILITARY_KEYWORDS)
+        return self._MILITARY_RE.search(title) is not None
     
-    def fetch_channel_list(self, channel_id: str, channel_name: str, page: int = 1) -> Optional[List[Dict]]:
+    def fetch_channel_list(self, channel_id: str, channel_name: str, page: int = 1,
+                           military_only: bool = False) -> Optional[List[Dict]]:
         """取得特定海事局的航警列表；存取失敗時回傳 None（與「沒有文章」的 [] 區分）
 
+        military_only=True 時，整頁 HTML 連一個軍事關鍵字都沒有就直接回傳 []，
+        不做解析——大多數列表頁都是這種情況；有的話也只回傳軍事相關的連結。
+
         改用主站 .jhtml 頻道頁 /{channelid去橫線小寫}/index.jhtml。
         原本的 /page/channelArticles.do 自 2026-03 起被 WAF 擋（403 ACCESS DENIED），
         而 .jhtml 頻道頁不在該 WAF 路徑後面、可正常存取。
@@ -82,30 +151,36 @@ class NavigationWarningScraper(BaseScraper):
             print(f"[{self.name}] ❌ 無法訪問 {channel_name} (第 {page} 頁)")
             return None
 
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html, 'html.parser')
-        articles = []
+        if military_only and not self._MILITARY_RE.search(html):
+            return []
 
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            # 航警文章詳情頁：/html/cnmsa/.../article/....html
-            if '/article/' not in href or '.html' not in href or '/html/cnmsa/' not in href:
-                continue
+        # 列表頁只用到連結，直接用 lxml 解析並以 XPath 取出文章連結，
+        # 不經過 BeautifulSoup 的 Python 物件樹
+        doc = etree.fromstring(html.encode('utf-8'), _UTF8_HTML_PARSER)
+        if doc is None:
+            return []
+        articles = []
 
-            raw = link.get_text(strip=True)
+        for link in _ARTICLE_LINK_XPATH(doc):
+            href = link.get('href')
+            # 等同 BeautifulSoup 的 get_text(strip=True)：各文字節點去頭尾空白後直接相接
+            raw = ''.join(t.strip() for t in link.xpath('.//text()'))
             if not raw:
                 continue
 
             # 列表文字通常為「標題—X航警NN/YY YYYY-MM-DD」，日期黏在末端
             date_text = ''
-            date_match = re.search(r'\d{4}-\d{2}-\d{2}', raw)
+            date_match = _LIST_DATE_RE.search(raw)
             if date_match:
                 date_text = date_match.group()
                 title = raw[:date_match.start()].strip()
             else:
                 title = raw
 
+            # 非軍事公告佔列表的絕大多數，先判斷再組 URL 與 dict
             is_military = self.is_military_related(title)
+            if military_only and not is_military:
+                continue
 
             full_url = href if href.startswith('http') else self.BASE_URL + href
 
@@ -121,21 +196,17 @@ class NavigationWarningScraper(BaseScraper):
     
     def fetch_article_content(self, url: str) -> Optional[str]:
         """取得公告詳細內容並清理"""
-        html = self.fetch_page(url)
+        html = self.fetch_page(url, max_chars=self.ARTICLE_MAX_CHARS)
         if not html:
             return None
         
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # 嘗試多種內容選擇器
-        content = None
-        for selector in ['div.article-content', 'div.content', 'div.TRS_Editor',
-                        'div.detail-content', 'article', 'div.main-content']:
-            content_div = soup.select_one(selector)
-            if content_div:
-                content = content_div.get_text(strip=True)
-                break
+        # 嘗試多種內容選擇器：先只解析正文 div，命中就不必建整棵 DOM
+        soup = BeautifulSoup(html, 'lxml', parse_only=_CONTENT_STRAINER)
+        content, matched = self._select_content(soup, _CONTENT_SELECTORS_STRAINED)
+        if not content:
+            soup = BeautifulSoup(html, 'lxml')
+            if not matched:
+                content, _ = self._select_content(soup, _CONTENT_SELECTORS_FULL)
         
         # 如果找不到，取得 body 內的主要文字
         if not content:
@@ -150,17 +221,37 @@ class NavigationWarningScraper(BaseScraper):
             content = self.extract_core_content(content)
         
         return content
+
+    @staticmethod
+    def _select_content(soup, selectors):
+        """回傳 (第一個命中選擇器的文字, 是否有命中)"""
+        for selector in selectors:
+            content_div = soup.select_one(selector)
+            if content_div:
+                return content_div.get_text(strip=True), True
+        return None, False
+
+    def fetch_article_contents(self, urls: List[str]) -> List[Optional[str]]:
+        """並行取得多篇公告內容，回傳順序與 urls 相同"""
+        if len(urls) <= 1 or self.detail_workers == 1:
+            return [self.fetch_article_content(u) for u in urls]
+        with ThreadPoolExecutor(max_workers=min(self.detail_workers, len(urls))) as pool:
+            return list(pool.map(self.fetch_article_content, urls))
     
     # 找不到航警編號時，用正文起點的標記把網站導覽列切掉。少了這一步，
     # body 文字會從「English 首页 机构职能…」開始，公告本體被推到 500 字之後，
     # 起訖日連同內容一起被 fallback 的截斷丟掉（實測 86 筆裡有 24 筆長度剛好
     # 是 500 且都含導覽列文字，起訖日全數遺失）。
-    _BODY_ANCHORS = [
+    _BODY_ANCHORS = tuple(re.compile(p) for p in (
         r'发布时间\s*[：:]\s*\d{4}-\d{2}-\d{2}',
         r'来源\s*[：:]',
         r'文号\s*[：:]',
         r'航行警告',
-    ]
+    ))
+
+    # 內容頁下載上限（字元）。正文只留 MAX_CONTENT_CHARS 字，而 MSA 內容頁
+    # 本體不過數十 KB；偶有內嵌大量資源的頁面，讀到這裡就停止下載
+    ARTICLE_MAX_CHARS = 512 * 1024
 
     # 正文長度上限。原本 500 對含座標列表的公告太短 —— 座標往往佔掉三四百字，
     # 起訖日寫在座標之後（"…AND 40-37.74N 121-03.77E FROM 231000UTC TO…"）。
@@ -169,49 +260,43 @@ class NavigationWarningScraper(BaseScraper):
     def extract_core_content(self, text: str) -> str:
         """提取核心內容：從航警編號到「收藏」之間的文字"""
         # 尋找航警編號開始位置
-        start_patterns = [
-            r'([a-zA-Z沪津辽冀鲁浙闽粤桂琼深厦甬青连珠汕湛苏]航警?\d+/\d+)',
-            r'([A-Z]{2,3}\d+/\d+)',
-        ]
-
         start_pos = -1
 
-        for pattern in start_patterns:
-            matches = list(re.finditer(pattern, text))
-            if matches:
-                for match in matches:
-                    after_text = text[match.end():match.end()+50]
-                    if '，' in after_text or '。' in after_text or ',' in after_text:
-                        start_pos = match.start()
-                        break
-                if start_pos != -1:
-                    break
+        for pattern in _START_RES:
+            match = pattern.search(text)
+            if match:
+                start_pos = match.start()
+                break
 
         if start_pos == -1:
             for anchor in self._BODY_ANCHORS:
-                m = re.search(anchor, text)
+                m = anchor.search(text)
                 if m:
                     start_pos = m.start()
                     break
         if start_pos == -1:
             return text[:self.MAX_CONTENT_CHARS]
 
-        # 尋找結束位置
-        end_patterns = ['收藏', '打印本页', '关闭窗口']
-        end_pos = len(text)
-        
-        for end_pattern in end_patterns:
-            pos = text.find(end_pattern, start_pos)
-            if pos != -1 and pos < end_pos:
-                end_pos = pos
+        # 尋找結束位置：三個標記一次掃描，最左邊的命中即最早出現者
+        end_match = _END_RE.search(text, start_pos)
+        end_pos = end_match.start() if end_match else len(text)
         
-        # 提取並清理
-        core_content = text[start_pos:end_pos].strip()
-        core_content = re.sub(r'\s+', ' ', core_content)
+        # 提取並清理。最後只留 MAX_CONTENT_CHARS 字，不必對整段（body fallback
+        # 時可能數十 KB）壓空白：先切出兩倍長度的頭段來壓，壓完仍超過上限就
+        # 夠用了——壓縮後的頭段必是整段壓縮結果的前綴，截出來的內容完全相同。
+        # 頭段空白多到壓完不足上限時才退回整段處理。
+        limit = self.MAX_CONTENT_CHARS
+        segment = text[start_pos:end_pos]
+        head = segment[:limit * 2]
+        # str.split() 以 C 實作切開任意長度的空白（與 regex 的 \s 同一組字元），
+        # 也順便去掉頭尾空白
+        core_content = ' '.join(head.split())
+        if len(core_content) <= limit and len(head) < len(segment):
+            core_content = ' '.join(segment.split())
         
         # 限制長度
-        if len(core_content) > self.MAX_CONTENT_CHARS:
-            core_content = core_content[:self.MAX_CONTENT_CHARS] + '...'
+        if len(core_content) > limit:
+            core_content = core_content[:limit] + '...'
 
         return core_content
     
@@ -220,78 +305,46 @@ class NavigationWarningScraper(BaseScraper):
         if not text:
             return []
 
-        coords = []
+        # 以四捨五入後的 (lat, lon) 為鍵邊掃邊去重：重複點不必再建 dict，
+        # 也省掉事後再掃一遍的 seen 集合；dict 保留插入順序
+        coords = {}
 
-        # 格式1: 38-31.3N121-33.2E / 31-21.60N/121-36.63E / 23-41.31N、117-31.49E
+        # 格式1 dash: 38-31.3N121-33.2E / 31-21.60N/121-36.63E / 23-41.31N、117-31.49E
         #
         # 分隔符必須包含全形頓號與逗號。福建海事局的公告用「、」分隔經緯度
         # （例：1）23-41.31N、117-31.49E），只認 / 和空白的話會整批解析失敗 ——
         # 而福建正對台灣海峽，是這個資料源裡最相關的來源。
-        pattern1 = (r'(\d{1,2})-(\d{1,2}(?:\.\d+)?)\s*([NS])\s*[/\s、，,]?\s*'
-                    r'(\d{1,3})-(\d{1,2}(?:\.\d+)?)\s*([EW])')
-        for match in re.finditer(pattern1, text):
-            lat_deg, lat_min, lat_dir, lon_deg, lon_min, lon_dir = match.groups()
-            lat = float(lat_deg) + float(lat_min) / 60
-            lon = float(lon_deg) + float(lon_min) / 60
-            if lat_dir == 'S':
-                lat = -lat
-            if lon_dir == 'W':
-                lon = -lon
-            coords.append({
-                'lat': round(lat, 4),
-                'lon': round(lon, 4),
-                'raw': match.group()
-            })
-        
-        # 格式2: N 39°24′35″、E 119°13′44″
-        pattern2 = r'([NS])?\s*(\d{1,2})°(\d{1,2})′(\d{1,2}(?:\.\d+)?)?″?\s*([NS])?\s*[、,\s]*([EW])?\s*(\d{1,3})°(\d{1,2})′(\d{1,2}(?:\.\d+)?)?″?\s*([EW])?'
-        for match in re.finditer(pattern2, text):
-            groups = match.groups()
-            lat_dir = groups[0] or groups[4] or 'N'
-            lat_deg, lat_min, lat_sec = groups[1], groups[2], groups[3] or '0'
-            lon_dir = groups[5] or groups[9] or 'E'
-            lon_deg, lon_min, lon_sec = groups[6], groups[7], groups[8] or '0'
-            
-            lat = float(lat_deg) + float(lat_min) / 60 + float(lat_sec) / 3600
-            lon = float(lon_deg) + float(lon_min) / 60 + float(lon_sec) / 3600
-            
-            if lat_dir == 'S':
-                lat = -lat
-            if lon_dir == 'W':
-                lon = -lon
-            
-            coords.append({
-                'lat': round(lat, 4),
-                'lon': round(lon, 4),
-                'raw': match.group()
-            })
-        
-        # 格式3: 38.5N 121.5E
-        pattern3 = r'(\d{1,2}(?:\.\d+)?)\s*([NS])\s*(\d{1,3}(?:\.\d+)?)\s*([EW])'
-        for match in re.finditer(pattern3, text):
-            lat, lat_dir, lon, lon_dir = match.groups()
-            lat = float(lat)
-            lon = float(lon)
-            if lat_dir == 'S':
-                lat = -lat
-            if lon_dir == 'W':
-                lon = -lon
-            coords.append({
-                'lat': round(lat, 4),
-                'lon': round(lon, 4),
-                'raw': match.group()
-            })
-        
-        # 去重
-        seen = set()
-        unique_coords = []
-        for c in coords:
-            key = (c['lat'], c['lon'])
-            if key not in seen:
-                seen.add(key)
-                unique_coords.append(c)
-        
-        return unique_coords
+        #
+        # 格式2 dms: N 39°24′35″、E 119°13′44″
+        # 格式3 dec: 38.5N 121.5E
+        for kind, pattern in _COORD_RES:
+            for match in pattern.finditer(text):
+                groups = match.groups()
+                if kind == 'dash':
+                    lat_deg, lat_min, lat_dir, lon_deg, lon_min, lon_dir = groups
+                    lat = float(lat_deg) + float(lat_min) / 60
+                    lon = float(lon_deg) + float(lon_min) / 60
+                elif kind == 'dms':
+                    lat_dir = groups[0] or groups[4] or 'N'
+                    lat_deg, lat_min, lat_sec = groups[1], groups[2], groups[3] or '0'
+                    lon_dir = groups[5] or groups[9] or 'E'
+                    lon_deg, lon_min, lon_sec = groups[6], groups[7], groups[8] or '0'
+                    lat = float(lat_deg) + float(lat_min) / 60 + float(lat_sec) / 3600
+                    lon = float(lon_deg) + float(lon_min) / 60 + float(lon_sec) / 3600
+                else:
+                    lat, lat_dir, lon, lon_dir = groups
+                    lat = float(lat)
+                    lon = float(lon)
+
+                if lat_dir == 'S':
+                    lat = -lat
+                if lon_dir == 'W':
+                    lon = -lon
+                key = (round(lat, 4), round(lon, 4))
+                if key not in coords:
+                    coords[key] = {'lat': key[0], 'lon': key[1], 'raw': match.group()}
+
+        return list(coords.values())
     
     def parse_time_period(self, text: str, publish_date=None) -> List:
         """解析演習/射擊窗，回傳 nav_warning_dates.Period 清單。
@@ -303,13 +356,41 @@ class NavigationWarningScraper(BaseScraper):
         """
         return parse_periods(text, publish_date)
 
-    def run(self, days_back: int = 365, max_pages: int = 1) -> List[Dict]:
+    def _on_or_after(self, date_str: str, cutoff_ordinal: int) -> bool:
+        """列表日期是否不早於截止日；無法解析的日期（如 2026-13-45）視為超出範圍"""
+        date_obj = self.parse_date(date_str)
+        return date_obj is not None and date_obj.toordinal() >= cutoff_ordinal
+
+    def _fetch_channel_articles(self, channel_id: str, channel_name: str, max_pages: int,
+                                military_only: bool):
+        """逐頁取得單一海事局的列表，回傳 (是否可存取, 文章列表)。
+
+        只要有任一頁成功即視為該頻道可存取。只抓軍事公告時，某頁回 [] 只代表
+        該頁沒有軍事公告，下一頁仍可能有，所以只在頁面取不到（None）時停止翻頁。
+        """
+        articles = []
+        channel_ok = False
+        for page in range(1, max_pages + 1):
+            page_articles = self.fetch_channel_list(
+                channel_id, channel_name, page=page, military_only=military_only)
+            if page_articles is None:
+                break
+            channel_ok = True
+            if not page_articles and not military_only:
+                break
+            articles.extend(page_articles)
+        return channel_ok, articles
+
+    def run(self, days_back: int = 365, max_pages: int = 1,
+            known_urls=None) -> List[Dict]:
         """
         執行爬蟲 (符合 BaseScraper 的簽名)
         
         Args:
             days_back: 追溯天數
             max_pages: 每個海事局最多抓取頁數（預設1頁=20篇）
+            known_urls: 已存檔公告的 URL；這些公告不再抓內容頁（合併時本來就是
+                既有資料優先，重抓的結果只會被丟掉）
             
         Returns:
             標準格式的航行警告列表
@@ -317,26 +398,33 @@ class NavigationWarningScraper(BaseScraper):
         print(f"[{self.name}] 🚢 開始爬取 {len(self.CHANNELS)} 個海事局的航行警告...")
 
         all_warnings = []
-        military_only = True  # 固定只抓軍事相關
+        military_only = self.military_only
         max_articles_per_channel = max_pages * 20  # 每頁約20篇
         self.ok_channels = 0
         self.failed_channels = 0
+        # 「days_back 天內」與其他爬蟲同一個定義（BaseScraper.cutoff_ordinal）；
+        # 截止日整批只算一次，列表日期（有快取的 parse_date）只比日期序數
+        now = datetime.now()
+        cutoff_ordinal = self.cutoff_ordinal(days_back)
+        # 同一次執行的公告共用一個抓取時間戳
+        scraped_at = now.isoformat()
+        # 不用真值判斷：呼叫端可能傳 pandas Series，bool(Series) 會直接拋 ValueError
+        known = set() if known_urls is None else {self.article_key(u) for u in known_urls}
+        skipped_known = 0
+        # 同一則公告可能同時列在兩頁或兩個海事局頻道，內容頁只抓一次
+        seen = set()
 
-        for channel_name, channel_id in self.CHANNELS.items():
-            print(f"[{self.name}] 📍 正在處理: {channel_name}")
-
-            # 逐頁取得列表；只要有任一頁成功即視為該頻道可存取
-            articles = []
-            channel_ok = False
-            for page in range(1, max_pages + 1):
-                page_articles = self.fetch_channel_list(channel_id, channel_name, page=page)
-                if page_articles is None:
-                    break
-                channel_ok = True
-                if not page_articles:
-                    break
-                articles.extend(page_articles)
-
+        # 12 個海事局的列表頁彼此獨立，與內容頁一樣交給 thread pool 並行抓；
+        # 列表頁與內容頁都走 fetch_page 的同一個全域限速，整次執行對站方的
+        # 請求速率上限都是 1 / delay（取代原本頻道間與文章間的固定 sleep）
+        channels = list(self.CHANNELS.items())
+        with ThreadPoolExecutor(max_workers=min(self.detail_workers, len(channels))) as pool:
+            listings = list(pool.map(
+                lambda ch: self._fetch_channel_articles(ch[1], ch[0], max_pages, military_only),
+                channels))
+
+        pending = []
+        for (channel_name, _), (channel_ok, articles) in zip(channels, listings):
             if channel_ok:
                 self.ok_channels += 1
             else:
@@ -346,55 +434,50 @@ class NavigationWarningScraper(BaseScraper):
                 articles = [a for a in articles if a['is_military']]
             
             # 日期過濾
-            filtered_articles = []
-            for article in articles[:max_articles_per_channel]:
-                if article['date']:
-                    date_obj = self.parse_date(article['date'])
-                    if date_obj and self.is_within_days(date_obj, days_back):
-                        filtered_articles.append(article)
-                else:
-                    filtered_articles.append(article)
-            
-            articles = filtered_articles
-            
-            print(f"[{self.name}]    找到 {len(articles)} 篇軍事相關公告")
+            articles = [a for a in articles[:max_articles_per_channel]
+                        if not a['date'] or self._on_or_after(a['date'], cutoff_ordinal)]
             
+            print(f"[{self.name}] 📍 {channel_name}: 找到 {len(articles)} 篇軍事相關公告")
+
             for article in articles:
-                # 取得詳細內容
-                content = self.fetch_article_content(article['url'])
-                
-                if content:
-                    # 解析座標
-                    coordinates = self.parse_coordinates(content)
-
-                    # 解析時間：標題也一起餵進去（英文公告的月份常只出現在標題後段），
-                    # 發布日用來推斷公告未寫出的年份與月份
-                    time_periods = self.parse_time_period(
-                        f"{article['title']} {content}", article.get('date'))
-
-                    warning = {
-                        'title': article['title'],
-                        'channel': channel_name,
-                        'publish_date': article['date'],
-                        'url': article['url'],
-                        'coordinates': coordinates,
-                        'coordinate_count': len(coordinates),
-                        'time_periods': time_periods,
-                        'content_preview': content,
-                        'is_military': article['is_military'],
-                        'scraped_at': datetime.now().isoformat()
-                    }
-                    
-                    all_warnings.append(warning)
-                
-                import time
-                time.sleep(0.5)
+                key = self.article_key(article['url'])
+                if key in known:
+                    skipped_known += 1
+                elif key not in seen:
+                    seen.add(key)
+                    pending.append(article)
             
-            import time
-            time.sleep(1)
+        # 取得詳細內容（網路等待為主，所有頻道的公告一起交給 thread pool 並行）
+        contents = self.fetch_article_contents([a['url'] for a in pending])
+
+        for article, content in zip(pending, contents):
+            if content:
+                # 解析座標
+                coordinates = self.parse_coordinates(content)
+
+                # 解析時間：標題也一起餵進去（英文公告的月份常只出現在標題後段），
+                # 發布日用來推斷公告未寫出的年份與月份
+                time_periods = self.parse_time_period(
+                    f"{article['title']} {content}", article.get('date'))
+
+                warning = {
+                    'title': article['title'],
+                    'channel': article['channel'],
+                    'publish_date': article['date'],
+                    'url': article['url'],
+                    'coordinates': coordinates,
+                    'coordinate_count': len(coordinates),
+                    'time_periods': time_periods,
+                    'content_preview': content,
+                    'is_military': article['is_military'],
+                    'scraped_at': scraped_at
+                }
+                
+                all_warnings.append(warning)
         
         print(f"[{self.name}] ✅ 完成！共抓取 {len(all_warnings)} 篇航行警告 "
-              f"(頻道可存取 {self.ok_channels}/{len(self.CHANNELS)})")
+              f"(頻道可存取 {self.ok_channels}/{len(self.CHANNELS)}，"
+              f"已存檔略過 {skipped_known} 篇)")
 
         return self.to_standard_format(all_warnings)
     
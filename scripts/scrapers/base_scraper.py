@@ -6,15 +6,73 @@
 提供統一的請求處理、日期解析、輸出格式等功能
 """
 
+import functools
 import httpx
 import inspect
 import os
+import threading
 import time
 import re
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from abc import ABC, abstractmethod
 
+try:
+    import h2  # noqa: F401  httpx 的 HTTP/2 支援需要 h2
+    HTTP2_AVAILABLE = True
+except ImportError:  # 未安裝時維持 HTTP/1.1
+    HTTP2_AVAILABLE = False
+
+
+# parse_date 依序嘗試的日期格式（預先編譯）；fmt 為 None 表示中文年月日
+_DATE_PATTERNS = (
+    (re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})'), '%Y-%m-%d'),
+    (re.compile(r'(\d{4})/(\d{1,2})/(\d{1,2})'), '%Y/%m/%d'),
+    (re.compile(r'(\d{4})年(\d{1,2})月(\d{1,2})日'), None),
+    (re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})'), '%m/%d/%Y'),
+)
+
+# _parse_date 快速路徑接受的（年後、月後、日後）分隔字元
+_FIXED_DATE_SEPARATORS = {('-', '-', ''), ('/', '/', ''), ('年', '月', '日')}
+
+# 已是標準輸出格式的日期（YYYY-MM-DD）
+_ISO_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+# 同一批列表常有大量同一天的日期字串，解析結果（不可變的 datetime）可直接共用
+@functools.lru_cache(maxsize=1024)
+def _parse_date(date_str: str) -> Optional[datetime]:
+    """BaseScraper.parse_date 的實作（輸入已去頭尾空白）"""
+    # 最常見的固定寬度格式（2026-01-17、2026/01/17、2026年01月17日）直接切字串建 datetime，
+    # 不必跑 regex + strptime；不合法的日期交給下面的完整流程處理
+    if len(date_str) in (10, 11) and date_str[:4].isdigit() \
+            and date_str[5:7].isdigit() and date_str[8:10].isdigit() \
+            and (date_str[4], date_str[7], date_str[10:]) in _FIXED_DATE_SEPARATORS:
+        try:
+            return datetime(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:10]))
+        except ValueError:
+            pass
+
+    for pattern, fmt in _DATE_PATTERNS:
+        match = pattern.search(date_str)
+        if match:
+            if fmt:
+                try:
+                    # 重建日期字串
+                    date_part = '-'.join(match.groups())
+                    return datetime.strptime(date_part.replace('/', '-'), '%Y-%m-%d')
+                except ValueError:
+                    continue
+            else:
+                # 中文格式
+                try:
+                    year, month, day = map(int, match.groups())
+                    return datetime(year, month, day)
+                except ValueError:
+                    continue
+    
+    return None
+
 
 class BaseScraper(ABC):
     """基礎爬蟲類"""
@@ -34,18 +92,36 @@ class BaseScraper(ABC):
         "Connection": "keep-alive",
         "Upgrade-Insecure-Requests": "1",
     }
+
+    # httpx.Client 本身就會重用連線；預設 keepalive_expiry 只有 5 秒，
+    # 而 fetch_page 每次請求前先睡 delay、重試時再退避，閒置連線常在下一個
+    # 請求前就被關掉、又得重新 TCP+TLS 握手。放寬到 30 秒，並讓 keep-alive
+    # 池容得下並行抓取的 worker 數
+    HTTP_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=8,
+                               keepalive_expiry=30.0)
+
+    # 讀取代理設定的環境變數；不需要走代理的子類設為 None
+    PROXY_ENV: Optional[str] = 'MSA_PROXY'
     
     def __init__(self, name: str, timeout: int = 30, delay: float = 1.0):
         self.name = name
         self.timeout = timeout
         self.delay = delay
+        # fetch_page 的全域限速：同一個爬蟲的所有執行緒共用，任兩次請求的送出時間
+        # 至少相隔 delay 秒，並行抓取時對站方的請求速率上限仍是 1 / delay
+        self._rate_lock = threading.Lock()
+        self._next_request_at = 0.0
         client_kwargs = dict(
             timeout=timeout,
             headers=self.DEFAULT_HEADERS,
             follow_redirects=True,
+            limits=self.HTTP_LIMITS,
+            # 有 h2 時啟用 HTTP/2：並行的 worker 共用同一條連線多工傳輸，
+            # 不必各自握手；伺服器不支援時 ALPN 會自動退回 HTTP/1.1
+            http2=HTTP2_AVAILABLE,
         )
         # MSA 網站對境外 IP 封鎖資料頁，可透過 MSA_PROXY 指定中國區代理
-        proxy = self._normalize_proxy(os.getenv('MSA_PROXY'))
+        proxy = self._normalize_proxy(os.getenv(self.PROXY_ENV) if self.PROXY_ENV else None)
         if proxy:
             # httpx >= 0.26 用 proxy=，舊版用 proxies=
             params = inspect.signature(httpx.Client.__init__).parameters
@@ -71,23 +147,28 @@ class BaseScraper(ABC):
             return f'http://{user}:{pwd}@{host}:{port}'
         return value
 
-    def fetch_page(self, url: str, retries: int = 3) -> Optional[str]:
+    def fetch_page(self, url: str, retries: int = 3,
+                   max_chars: Optional[int] = None) -> Optional[str]:
         """
         獲取網頁內容，帶重試機制
         
         Args:
             url: 目標 URL
             retries: 重試次數
+            max_chars: 只讀取前 max_chars 個字元就停止下載；None 表示讀完整頁
             
         Returns:
             網頁內容或 None
         """
         for attempt in range(retries):
             try:
-                time.sleep(self.delay)
-                response = self.client.get(url)
-                response.raise_for_status()
-                return response.text
+                self._wait_for_rate_limit()
+                with self.client.stream('GET', url) as response:
+                    if response.is_error:
+                        # 先讀完錯誤頁，下面印 body 預覽時串流已關閉
+                        response.read()
+                    response.raise_for_status()
+                    return self._read_text(response, max_chars)
             except httpx.HTTPStatusError as e:
                 body_preview = e.response.text[:200].replace('\n', ' ')
                 print(f"[{self.name}] Attempt {attempt + 1} failed for {url}: "
@@ -99,6 +180,31 @@ class BaseScraper(ABC):
                 if attempt < retries - 1:
                     time.sleep(self.delay * (attempt + 1))
         return None
+
+    def _wait_for_rate_limit(self):
+        """預約下一個請求時段並等到該時段；鎖只保護預約，等待時不持有"""
+        with self._rate_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_request_at)
+            self._next_request_at = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+
+    @staticmethod
+    def _read_text(response: httpx.Response, max_chars: Optional[int]) -> str:
+        """讀取串流回應；達到 max_chars 後不再下載剩下的內容"""
+        if max_chars is None:
+            response.read()
+            return response.text
+        parts = []
+        n = 0
+        # iter_text 以回應編碼增量解碼，多位元組字元跨 chunk 也不會被切壞
+        for chunk in response.iter_text():
+            parts.append(chunk)
+            n += len(chunk)
+            if n >= max_chars:
+                break
+        return ''.join(parts)[:max_chars]
     
     def parse_date(self, date_str: str) -> Optional[datetime]:
         """
@@ -112,42 +218,33 @@ class BaseScraper(ABC):
         """
         if not date_str:
             return None
-            
-        date_str = date_str.strip()
-        
-        patterns = [
-            (r'(\d{4})-(\d{1,2})-(\d{1,2})', '%Y-%m-%d'),
-            (r'(\d{4})/(\d{1,2})/(\d{1,2})', '%Y/%m/%d'),
-            (r'(\d{4})年(\d{1,2})月(\d{1,2})日', None),
-            (r'(\d{1,2})/(\d{1,2})/(\d{4})', '%m/%d/%Y'),
-        ]
-        
-        for pattern, fmt in patterns:
-            match = re.search(pattern, date_str)
-            if match:
-                if fmt:
-                    try:
-                        # 重建日期字串
-                        date_part = '-'.join(match.groups())
-                        return datetime.strptime(date_part.replace('/', '-'), '%Y-%m-%d')
-                    except ValueError:
-                        continue
-                else:
-                    # 中文格式
-                    try:
-                        year, month, day = map(int, match.groups())
-                        return datetime(year, month, day)
-                    except ValueError:
-                        continue
-        
-        return None
+        return _parse_date(date_str.strip())
     
+    @staticmethod
+    def cutoff_datetime(days_back: int) -> datetime:
+        """days_back 天前的此刻；逐篇比較時先算一次再重複使用"""
+        return datetime.now() - timedelta(days=days_back)
+
+    @classmethod
+    def cutoff_ordinal(cls, days_back: int) -> int:
+        """
+        最早仍在範圍內的日期序數（date.toordinal）
+
+        只有日期（當天 00:00）的比較可改用整數：d.toordinal() >= cutoff_ordinal
+        與 d >= cutoff_datetime(days_back) 等價
+        """
+        cutoff = cls.cutoff_datetime(days_back)
+        ordinal = cutoff.toordinal()
+        # cutoff 不是剛好午夜時，當天 00:00 已早於 cutoff
+        if cutoff != datetime(cutoff.year, cutoff.month, cutoff.day):
+            ordinal += 1
+        return ordinal
+
     def is_within_days(self, date: datetime, days_back: int) -> bool:
         """檢查日期是否在指定天數內"""
         if not date:
             return False
-        cutoff = datetime.now() - timedelta(days=days_back)
-        return date >= cutoff
+        return date >= self.cutoff_datetime(days_back)
     
     def to_standard_format(self, articles: List[Dict]) -> List[Dict]:
         """
@@ -165,9 +262,18 @@ class BaseScraper(ABC):
         """
         standardized = []
         for article in articles:
-            date_obj = self.parse_date(article.get('date', ''))
+            raw_date = (article.get('date') or '').strip()
+            # 仍須解析以剔除 2011-02-31 這類不存在的日期（_parse_date 有快取與固定寬度快速路徑）
+            date_obj = _parse_date(raw_date) if raw_date else None
+            if date_obj is None:
+                date = ''
+            elif date_obj.year >= 1000 and _ISO_DATE_RE.fullmatch(raw_date):
+                # 爬蟲多半已輸出合法的 YYYY-MM-DD，不必再格式化回同一個字串
+                date = raw_date
+            else:
+                date = date_obj.strftime('%Y-%m-%d')
             std_article = {
-                'date': date_obj.strftime('%Y-%m-%d') if date_obj else '',
+                'date': date,
                 'title': article.get('title', '').strip(),
                 'content': article.get('content', '').strip(),
                 'url': article.get('url', ''),
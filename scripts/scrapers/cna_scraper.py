@@ -6,14 +6,30 @@ CNA 新聞爬蟲 (SerpAPI 版本)
 使用 Google News API (via SerpAPI) 來避開 CNA 網站的反爬蟲機制
 """
 
+import hashlib
 import httpx
+import json
+import tempfile
 import time
 import os
 import re
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
 from typing import List, Dict, Optional
 from .base_scraper import BaseScraper
 
+try:
+    import orjson
+except ImportError:  # orjson 只是加速用，未安裝時退回標準 json
+    orjson = None
+
+# 預先編譯的正規表示式（每篇文章 / 每筆搜尋結果都會用到）
+_URL_DATE_RE = re.compile(r'/(\d{8})\d+\.aspx')
+_P_RE = re.compile(r'<p[^>]*>(.*?)</p>', re.DOTALL)
+_PARAGRAPH_RE = re.compile(r'class="paragraph"[^>]*>(.*?)</article>', re.DOTALL)
+_ARTICLE_RE = re.compile(r'<article[^>]*>(.*?)</article>', re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+
 
 class CNAScraper(BaseScraper):
     """
@@ -23,6 +39,25 @@ class CNAScraper(BaseScraper):
     
     BASE_URL = "https://www.cna.com.tw"
     SERPAPI_URL = "https://serpapi.com/search.json"
+
+    # SerpAPI 與 cna.com.tw 都不需要（也不該走）MSA 的中國區代理
+    PROXY_ENV = None
+
+    # 兩種請求共用 self.client（同一個連線池），以每次請求的 headers 覆寫預設值。
+    # DEFAULT_HEADERS 宣告了 br，但 httpx 需另裝 brotli 才能解碼，這裡只要 gzip/deflate
+    SERPAPI_HEADERS = {
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+    }
+    ARTICLE_HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+        "Accept": "text/html",
+        "Accept-Language": "zh-TW,zh;q=0.9",
+        "Accept-Encoding": "gzip, deflate",
+    }
+    # DEFAULT_HEADERS 裡原本獨立 article_client 不會送出的欄位，文章請求送出前移除，
+    # 讓 cna.com.tw 看到的請求頭與合併 client 之前相同
+    ARTICLE_OMIT_HEADERS = ("Upgrade-Insecure-Requests",)
     
     # 搜尋關鍵字 - 精準聚焦台海軍事活動
     KEYWORDS = [
@@ -37,27 +72,41 @@ class CNAScraper(BaseScraper):
         "禁航 海域 site:cna.com.tw",       # 劃設禁航區
     ]
 
-    def __init__(self, timeout: int = 30, delay: float = 1.5):
+    # SerpAPI 回應的磁碟快取位置（可用 SERPAPI_CACHE_DIR 覆寫）與有效秒數
+    DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'cna_serpapi')
+    CACHE_TTL = 3600
+
+    def __init__(self, timeout: int = 30, delay: float = 1.5, content_workers: int = 4,
+                 search_workers: int = 3, enable_cache: Optional[bool] = None):
         super().__init__(name="cna", timeout=timeout, delay=delay)
+        # SerpAPI 回應的磁碟快取（每次查詢都會計費），供除錯時短時間內重跑用。
+        # 預設關閉：常駐 runner 上的正式排程若沿用舊結果，會漏掉其間新發布的文章。
+        # enable_cache=True 或設定 SERPAPI_CACHE_DIR 時啟用，快取超過 CACHE_TTL 即失效
+        if enable_cache is None:
+            enable_cache = bool(os.environ.get('SERPAPI_CACHE_DIR'))
+        self.cache_dir = ((os.environ.get('SERPAPI_CACHE_DIR') or self.DEFAULT_CACHE_DIR)
+                          if enable_cache else None)
+        # 同時送出的 SerpAPI 查詢數，避免超出 API 的並行/速率限制
+        self.search_workers = max(1, search_workers)
+        # 內文並行抓取的 worker 數；scrape_full_content 每次請求前仍先睡 delay 秒，
+        # 對 cna.com.tw 的請求速率上限為 content_workers / delay
+        self.content_workers = max(1, content_workers)
         self.serpapi_key = os.environ.get('SERPAPI_KEY', '')
         
         if not self.serpapi_key:
             raise ValueError("❌ 必須設定 SERPAPI_KEY 環境變數")
         
         print(f"[{self.name}] ✓ SerpAPI 已啟用")
-        self.article_client = httpx.Client(
-            timeout=timeout,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "Accept": "text/html",
-                "Accept-Language": "zh-TW,zh;q=0.9",
-            },
-            follow_redirects=True
-        )
+        print(f"[{self.name}] 💾 SerpAPI 快取: {self.cache_dir or '停用'}")
 
     def _extract_date_from_url(self, url: str) -> str:
         """從 URL 提取日期字串 (YYYY-MM-DD)"""
-        match = re.search(r'/(\d{8})\d+\.aspx', url)
+        # 常見情形 .../news/aipl/202601170123.aspx：直接切字串，不必跑 regex
+        slash = url.rfind('/')
+        tail = url[slash + 1:]
+        if slash != -1 and tail.endswith('.aspx') and len(tail) > 13 and tail[:-5].isdigit():
+            return f"{tail[:4]}-{tail[4:6]}-{tail[6:8]}"
+        match = _URL_DATE_RE.search(url)
         if match:
             d = match.group(1)
             return f"{d[:4]}-{d[4:6]}-{d[6:8]}"
@@ -109,18 +158,66 @@ class CNAScraper(BaseScraper):
         
         return False
 
-    def _search_with_serpapi(self, query: str, days_back: int = 7) -> List[Dict]:
+    @staticmethod
+    def _day_of(dt: datetime) -> datetime:
+        """取日期部分（當天 00:00、無時區），與 URL 日期解析結果一致"""
+        return datetime(dt.year, dt.month, dt.day)
+
+    def _serpapi_cache_path(self, query: str) -> str:
+        """查詢的快取檔路徑；key 含當天日期，跨日不會沿用"""
+        key = hashlib.sha256(f"{query}|{date.today().isoformat()}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _serpapi_cache_get(self, query: str) -> Optional[Dict]:
+        """讀取快取的 SerpAPI 回應；不存在、已過期（依檔案 mtime）或損壞時回傳 None"""
+        if not self.cache_dir:
+            return None
+        path = self._serpapi_cache_path(query)
+        try:
+            if time.time() - os.path.getmtime(path) > self.CACHE_TTL:
+                return None
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _serpapi_cache_put(self, query: str, data: Dict, log: Optional[List[str]] = None):
+        """寫入快取；寫入失敗只影響快取，不影響爬取"""
+        if not self.cache_dir:
+            return
+        path = self._serpapi_cache_path(query)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 先寫暫存檔再 replace，並行查詢或中斷時不會留下半個檔案
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            self._emit(log, f"[{self.name}] ⚠️  SerpAPI 快取寫入失敗: {e}")
+
+    @staticmethod
+    def _emit(log: Optional[List[str]], message: str):
+        """log 為 list 時先收集訊息（並行查詢結束後再依查詢順序印出），否則直接印"""
+        if log is None:
+            print(message)
+        else:
+            log.append(message)
+
+    def _search_with_serpapi(self, query: str, days_back: int = 7,
+                             log: Optional[List[str]] = None) -> List[Dict]:
         """
         使用 SerpAPI Google News 搜尋
         
         Args:
             query: 搜尋關鍵字 (已包含 site:cna.com.tw)
             days_back: 天數範圍
+            log: 進度訊息的收集處；None 表示直接印出
             
         Returns:
             新聞列表
         """
-        print(f"[{self.name}] 🔍 SerpAPI 搜尋: {query}")
+        self._emit(log, f"[{self.name}] 🔍 SerpAPI 搜尋: {query}")
         
         try:
             params = {
@@ -132,17 +229,28 @@ class CNAScraper(BaseScraper):
                 'num': 30  # 每個關鍵字返回 30 筆
             }
             
-            response = httpx.get(self.SERPAPI_URL, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            data = self._serpapi_cache_get(query)
+            from_cache = data is not None
+            if from_cache:
+                self._emit(log, f"[{self.name}] 💾 使用快取結果")
+            else:
+                # 走 self.client 的連線池：各關鍵字查詢共用同一條到 serpapi.com 的連線，
+                # 不必每次重新 TCP+TLS 握手
+                response = self.client.get(self.SERPAPI_URL, params=params,
+                                           headers=self.SERPAPI_HEADERS)
+                response.raise_for_status()
+                data = orjson.loads(response.content) if orjson is not None else response.json()
+                self._serpapi_cache_put(query, data, log)
             
             articles = []
             news_results = data.get('news_results', [])
+            # 截止日整批只算一次；date_obj 都是當天 00:00，比較日期序數即可
+            cutoff_ordinal = self.cutoff_ordinal(days_back)
             
             total_results = len(news_results)
             filtered_count = 0
             
-            print(f"[{self.name}] 📥 返回 {total_results} 筆結果")
+            self._emit(log, f"[{self.name}] 📥 返回 {total_results} 筆結果")
             
             for item in news_results:
                 # 提取基本資訊
@@ -158,12 +266,16 @@ class CNAScraper(BaseScraper):
                     filtered_count += 1
                     continue
                 
-                # 提取日期
+                # 提取日期（date_obj 為當天 00:00）
                 date_str = self._extract_date_from_url(link)
-                
-                # 如果 URL 沒有日期，嘗試從 API 回傳的時間解析
-                if not date_str:
-                    # 嘗試多種日期格式
+                date_obj = None
+                if date_str:
+                    try:
+                        date_obj = datetime.fromisoformat(date_str)
+                    except ValueError:
+                        pass
+                else:
+                    # 如果 URL 沒有日期，嘗試從 API 回傳的時間解析（多種日期格式）
                     date_value = item.get('date', '')
                     
                     # 格式1: 字典格式 {'iso_date': '...'}
@@ -171,14 +283,14 @@ class CNAScraper(BaseScraper):
                         iso_date = date_value.get('iso_date', '')
                         if iso_date:
                             try:
-                                date_obj = datetime.fromisoformat(iso_date.replace('Z', '+00:00'))
+                                date_obj = self._day_of(datetime.fromisoformat(iso_date.replace('Z', '+00:00')))
                                 date_str = date_obj.strftime('%Y-%m-%d')
                             except:
                                 pass
                     # 格式2: 直接是 ISO 字符串
                     elif isinstance(date_value, str) and date_value:
                         try:
-                            date_obj = datetime.fromisoformat(date_value.replace('Z', '+00:00'))
+                            date_obj = self._day_of(datetime.fromisoformat(date_value.replace('Z', '+00:00')))
                             date_str = date_obj.strftime('%Y-%m-%d')
                         except:
                             pass
@@ -187,9 +299,8 @@ class CNAScraper(BaseScraper):
                     if not date_str:
                         continue
                 
-                # 檢查日期範圍
-                date_obj = self.parse_date(date_str)
-                if not date_obj or not self.is_within_days(date_obj, days_back):
+                # 檢查日期範圍：直接用上面已解析的 date_obj，不再 parse_date 一次
+                if not date_obj or date_obj.toordinal() < cutoff_ordinal:
                     continue
                 
                 articles.append({
@@ -198,12 +309,13 @@ class CNAScraper(BaseScraper):
                     'date': date_str
                 })
             
-            print(f"[{self.name}] ✓ 找到 {len(articles)} 篇相關新聞 (過濾掉 {filtered_count} 篇不相關)")
-            time.sleep(self.delay)  # 避免 API 限流
+            self._emit(log, f"[{self.name}] ✓ 找到 {len(articles)} 篇相關新聞 (過濾掉 {filtered_count} 篇不相關)")
+            if not from_cache:
+                time.sleep(self.delay)  # 避免 API 限流
             return articles
             
         except Exception as e:
-            print(f"[{self.name}] ✗ SerpAPI 錯誤: {e}")
+            self._emit(log, f"[{self.name}] ✗ SerpAPI 錯誤: {e}")
             return []
 
     def scrape_full_content(self, url: str) -> str:
@@ -213,15 +325,20 @@ class CNAScraper(BaseScraper):
         """
         try:
             time.sleep(self.delay)
-            response = self.article_client.get(url)
-            
-            # 即使 403 也嘗試解析（有些內容可能在錯誤頁面）
-            if response.status_code == 403:
-                print(f"[{self.name}] ⚠️  {url} 返回 403，嘗試提取標題")
-                return f"[無法獲取完整內文，可能需要瀏覽器訪問]"
-            
-            response.raise_for_status()
-            html = response.text
+            request = self.client.build_request('GET', url, headers=self.ARTICLE_HEADERS)
+            for key in self.ARTICLE_OMIT_HEADERS:
+                request.headers.pop(key, None)
+            response = self.client.send(request, stream=True)
+            try:
+                # 即使 403 也嘗試解析（有些內容可能在錯誤頁面）
+                if response.status_code == 403:
+                    print(f"[{self.name}] ⚠️  {url} 返回 403，嘗試提取標題")
+                    return f"[無法獲取完整內文，可能需要瀏覽器訪問]"
+
+                response.raise_for_status()
+                html = self._read_article_html(response)
+            finally:
+                response.close()
 
             # 鎖定內文區塊：從 class="paragraph" 起，至常見的頁尾/分享/相關新聞前止。
             # （舊版只抓到第一個 </div>，遇到段落間的相關新聞插入 <div> 會被截斷，
@@ -237,32 +354,59 @@ class CNAScraper(BaseScraper):
                     break
 
             # 擷取區塊內所有 <p> 段落文字並串接，保留完整內文（含座標段落）
-            paras = re.findall(r'<p[^>]*>(.*?)</p>', region, re.DOTALL)
+            paras = _P_RE.findall(region)
             if paras:
                 content = " ".join(paras)
             else:
                 # 退回：整段 paragraph 容器，或 <article>
-                pm = re.search(r'class="paragraph"[^>]*>(.*?)</article>', html, re.DOTALL)
+                # paragraph 容器只可能從 start 起出現；找不到 class="paragraph" 就不必掃整頁
+                pm = _PARAGRAPH_RE.search(html, start) if start != -1 else None
                 if not pm:
-                    pm = re.search(r'<article[^>]*>(.*?)</article>', html, re.DOTALL)
+                    pm = _ARTICLE_RE.search(html)
                 content = pm.group(1) if pm else region
 
-            # 清理標籤與多餘空格
-            content = re.sub(r'<[^>]+>', ' ', content)
-            content = re.sub(r'\s+', ' ', content)
+            # 清理標籤與多餘空格：split/join 一次完成空白收斂與去頭尾，
+            # 不必再跑一趟 \s+ 取代產生另一份中間字串
+            content = _TAG_RE.sub(' ', content)
 
-            return content.strip() if content else "[內文提取失敗]"
+            return ' '.join(content.split()) if content else "[內文提取失敗]"
             
         except Exception as e:
             print(f"[{self.name}] ✗ 內文抓取錯誤 ({url}): {e}")
             return "[內文提取失敗]"
 
-    def run(self, days_back: int = 7) -> List[Dict]:
+    @staticmethod
+    def _read_article_html(response: httpx.Response) -> str:
+        """
+        串流讀取文章頁；內文區塊已完整收到時就停止下載
+
+        區塊以 paragraphInfo 收尾（見 scrape_full_content 的 marker 順序），
+        一旦收到它且區塊內已有 <p> 段落，後面的相關新聞、腳本與頁尾都用不到；
+        其他情況（沒有 paragraphInfo、需要退回整頁解析）則讀完整頁，結果不變
+        """
+        html = ''
+        start = -1
+        for chunk in response.iter_text(chunk_size=32768):
+            html += chunk
+            if start == -1:
+                start = html.find('class="paragraph"')
+                if start == -1:
+                    continue
+            end = html.find('class="paragraphInfo"', start)
+            if end != -1 and _P_RE.search(html, start, end):
+                break
+        return html
+
+    def run(self, days_back: int = 7, max_articles: Optional[int] = None,
+            fetch_content: bool = True) -> List[Dict]:
         """
         執行爬取主流程（完全使用 SerpAPI）
         
         Args:
             days_back: 追蹤天數
+            max_articles: 最多收集幾篇（去重後，依 KEYWORDS 順序）；None 表示不限
+            fetch_content: False 時只回傳標題/日期/URL（content 為空），
+                           跳過佔大部分時間的內文抓取
             
         Returns:
             標準格式新聞列表
@@ -274,47 +418,59 @@ class CNAScraper(BaseScraper):
         raw_articles = []
         collected_urls = set()
 
-        # 使用 SerpAPI 搜尋所有關鍵字
-        for i, query in enumerate(self.KEYWORDS, 1):
+        # 使用 SerpAPI 搜尋所有關鍵字：各查詢互相獨立，並行送出後依 KEYWORDS 順序合併，
+        # 去重結果與逐一查詢時相同。各查詢的進度訊息先收集起來，合併時依序印出，
+        # 避免並行時不同查詢的訊息交錯、看不出哪筆結果/錯誤屬於哪個關鍵字
+        logs = [[] for _ in self.KEYWORDS]
+        with ThreadPoolExecutor(max_workers=self.search_workers) as pool:
+            results = list(pool.map(lambda q, log: self._search_with_serpapi(q, days_back, log),
+                                    self.KEYWORDS, logs))
+
+        for i, (articles, log) in enumerate(zip(results, logs), 1):
             print(f"\n[{self.name}] [{i}/{len(self.KEYWORDS)}] 處理關鍵字...")
-            articles = self._search_with_serpapi(query, days_back)
-            
+            for message in log:
+                print(message)
             for article in articles:
                 if article['url'] not in collected_urls:
                     collected_urls.add(article['url'])
                     raw_articles.append(article)
-            
+                    if max_articles is not None and len(raw_articles) >= max_articles:
+                        break
+
             print(f"[{self.name}] ✓ 累計收集: {len(raw_articles)} 篇（去重後）")
+            if max_articles is not None and len(raw_articles) >= max_articles:
+                print(f"[{self.name}] ⏹ 已達上限 {max_articles} 篇，不再合併其餘關鍵字")
+                break
 
         if not raw_articles:
             print(f"\n[{self.name}] ❌ 未找到任何新聞")
             return []
 
-        # 爬取內文
-        print(f"\n[{self.name}] 📥 開始爬取 {len(raw_articles)} 篇文章內文...")
+        # 爬取內文：每篇都是獨立的網路等待，交給 thread pool 並行
         success_count = 0
-        
-        for i, article in enumerate(raw_articles, 1):
-            print(f"[{self.name}] [{i}/{len(raw_articles)}] {article['title'][:50]}...")
-            article['content'] = self.scrape_full_content(article['url'])
-            
-            if article['content'] and "[內文提取失敗]" not in article['content']:
-                success_count += 1
+        if fetch_content:
+            print(f"\n[{self.name}] 📥 開始爬取 {len(raw_articles)} 篇文章內文...")
+            with ThreadPoolExecutor(max_workers=self.content_workers) as pool:
+                contents = pool.map(self.scrape_full_content, [a['url'] for a in raw_articles])
+                for i, (article, content) in enumerate(zip(raw_articles, contents), 1):
+                    print(f"[{self.name}] [{i}/{len(raw_articles)}] {article['title'][:50]}...")
+                    article['content'] = content
+
+                    if content and "[內文提取失敗]" not in content:
+                        success_count += 1
+        else:
+            print(f"\n[{self.name}] ⏭ 略過內文抓取（fetch_content=False）")
 
         # 轉換為標準格式
         standardized = self.to_standard_format(raw_articles)
         
         print(f"\n[{self.name}] ✅ 完成！")
         print(f"[{self.name}] 📊 總計: {len(standardized)} 篇新聞")
-        print(f"[{self.name}] 📄 內文成功: {success_count}/{len(raw_articles)} 篇")
+        if fetch_content:
+            print(f"[{self.name}] 📄 內文成功: {success_count}/{len(raw_articles)} 篇")
         
         return standardized
 
-    def close(self):
-        """關閉連接"""
-        super().close()
-        self.article_client.close()
-
 
 if __name__ == "__main__":
     import sys
@@ -330,7 +486,14 @@ if __name__ == "__main__":
     print("=" * 70)
     
     try:
-        with CNAScraper(delay=1.5) as scraper:
+        # --cache：啟用 SerpAPI 快取（CACHE_TTL 內重跑不再計費）；--no-cache：強制停用
+        if '--no-cache' in sys.argv:
+            enable_cache = False
+        elif '--cache' in sys.argv:
+            enable_cache = True
+        else:
+            enable_cache = None
+        with CNAScraper(delay=1.5, enable_cache=enable_cache) as scraper:
             results = scraper.run(days_back=3)
             
             print(f"\n{'='*70}")
@@ -16,9 +16,11 @@ import os
 import sys
 import time
 import json
+import functools
 import subprocess
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 
 # ── paths ──────────────────────────────────────────────
@@ -28,6 +30,23 @@ SORTIES_CSV = os.path.join(ROOT, "data", "JapanandBattleship.csv")
 CHART_PATH = os.path.join(ROOT, "data", "charts", "threads_chart.png")
 
 THREADS_API = "https://graph.threads.net/v1.0"
+# Backoff schedule (seconds) while waiting for a media container; ~14s total.
+CONTAINER_POLL_DELAYS = (1, 1, 2, 2, 3, 5)
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+def _build_session():
+    """Keep-alive session for graph.threads.net; retries idempotent calls on 429/5xx."""
+    session = requests.Session()
+    retry = Retry(
+        total=3, backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False,
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+    return session
+
+
+_SESSION = _build_session()
 REPO_RAW_BASE = "https://raw.githubusercontent.com/s0914712/pla-data-dashboard/main"
 
 
@@ -35,19 +54,28 @@ REPO_RAW_BASE = "https://raw.githubusercontent.com/s0914712/pla-data-dashboard/m
 
 def get_latest_actual():
     """Return (date_str, weekday_str, sorties) of the most recent actual record."""
+    import pandas as pd  # lazy: skip the pandas import cost on early-exit paths
     df = pd.read_csv(SORTIES_CSV)
     df["date"] = pd.to_datetime(df["date"], format="mixed", dayfirst=False)
     df = df.dropna(subset=["pla_aircraft_sorties"])
     df = df.sort_values("date")
     row = df.iloc[-1]
     d = row["date"]
-    weekday_zh = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"][d.weekday()]
+    weekday_zh = WEEKDAYS[d.weekday()]
     date_str = d.strftime("%m/%d")
     return date_str, weekday_zh, int(row["pla_aircraft_sorties"])
 
 
 def load_predictions():
-    df = pd.read_csv(PRED_CSV)
+    """Return predictions sorted by date; re-parsed only when the CSV changes."""
+    return _load_predictions_cached(PRED_CSV, os.path.getmtime(PRED_CSV))
+
+
+@functools.lru_cache(maxsize=4)
+def _load_predictions_cached(path, mtime):
+    # mtime is part of the cache key so an updated CSV invalidates the entry.
+    import pandas as pd
+    df = pd.read_csv(path)
     df["date"] = pd.to_datetime(df["date"])
     return df.sort_values("date")
 
@@ -103,6 +131,26 @@ def upload_chart_to_github():
     return f"{REPO_RAW_BASE}/data/charts/threads_chart.png?t={cache_bust}"
 
 
+def wait_for_container(container_id, token):
+    """Poll the container status until FINISHED/ERROR or the backoff runs out."""
+    status = None
+    for delay in CONTAINER_POLL_DELAYS:
+        time.sleep(delay)
+        try:
+            resp = _SESSION.get(
+                f"{THREADS_API}/{container_id}",
+                params={"fields": "status", "access_token": token},
+            )
+            status = resp.json().get("status")
+        except (requests.RequestException, ValueError) as e:
+            print(f"Container status check failed: {e}")
+            continue
+        if status in ("FINISHED", "ERROR", "EXPIRED"):
+            break
+    print(f"Container status: {status}")
+    return status
+
+
 def post_to_threads(text, image_url):
     """Publish a single image post to Threads."""
     user_id = os.environ["THREADS_USER_ID"]
@@ -110,7 +158,7 @@ def post_to_threads(text, image_url):
 
     # Step 1: create media container
     print("Creating Threads media container...")
-    resp = requests.post(
+    resp = _SESSION.post(
         f"{THREADS_API}/{user_id}/threads",
         params={
             "media_type": "IMAGE",
@@ -126,12 +174,15 @@ def post_to_threads(text, image_url):
     container_id = data["id"]
     print(f"Container created: {container_id}")
 
-    # Step 2: wait for processing
-    time.sleep(10)
+    # Step 2: wait for processing; a failed or expired container cannot be published
+    status = wait_for_container(container_id, token)
+    if status in ("ERROR", "EXPIRED"):
+        print(f"Container processing failed: {status}")
+        sys.exit(1)
 
     # Step 3: publish
     print("Publishing to Threads...")
-    resp = requests.post(
+    resp = _SESSION.post(
         f"{THREADS_API}/{user_id}/threads_publish",
         params={
             "creation_id": container_id,